@@ -0,0 +1,19 @@
+"""
+Shared pytest fixtures for the test scripts
+"""
+import pytest
+
+from test_common import SESSION, server_is_up
+
+def pytest_sessionstart(session):
+    """Stop the whole run straight away if the server isn't up"""
+    # Under pytest-xdist only the controller checks; workers aren't started if it exits
+    if hasattr(session.config, "workerinput"):
+        return
+    if not server_is_up():
+        pytest.exit("Cannot connect to server. Make sure it's running!", returncode=1)
+
+@pytest.fixture(scope="session")
+def session():
+    """The shared HTTP session"""
+    return SESSION
@@ -106,17 +106,22 @@ def create_sample_events():
         }
     ]
     
-    created_count = 0
-    for event in events:
-        try:
-            response = requests.post(f"{BASE_URL}/calendar/events", json=event)
-            if response.status_code == 200:
-                created_count += 1
-                print(f"✅ Created: {event['title']}")
-            else:
-                print(f"⚠️  Failed to create {event['title']}: {response.text}")
-        except Exception as e:
-            print(f"❌ Error creating {event['title']}: {e}")
+    # Send all events in one request instead of one POST per event
+    with requests.Session() as session:
+        response = session.post(f"{BASE_URL}/calendar/events/bulk", json=events)
+    if response.status_code != 200:
+        print(f"❌ Failed to create events: {response.text}")
+        return
+
+    result = response.json()
+    for item in result["results"]:
+        event = events[item["index"]]
+        if item["outcome"] == "error":
+            print(f"⚠️  Failed to create {event['title']}: {item['detail']}")
+        else:
+            print(f"✅ Created: {event['title']}")
+
+    created_count = result["created"]
     
     print(f"\n✅ Created {created_count} calendar events!")
     print("\nYou can now view the calendar at http://localhost:8000")
@@ -5,83 +5,200 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Depends
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse, Response
+from fastapi.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Literal
+from typing import Iterator, List, Optional, Literal
 from datetime import datetime, date, time, timedelta
 from collections import defaultdict
 import os
-import json
+import threading
+import zlib
+import asyncio
+import bisect
+import hashlib
+import sqlite3
+import orjson
 from pathlib import Path
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson instead of the stdlib json module"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load activities when the server starts"""
+    activities.update(load_activities())
+    participant_sets.update(
+        (name, set(activity["participants"])) for name, activity in activities.items()
+    )
+    for name, activity in activities.items():
+        for email in activity["participants"]:
+            student_to_activities[email].add(name)
+    activity_locks.update((name, asyncio.Lock()) for name in activities)
+    invalidate_activities_cache()
+    if ATTENDANCE_DB:
+        open_attendance_db(ATTENDANCE_DB)
+    yield
+    if attendance_db is not None:
+        attendance_db.close()
+
 
 app = FastAPI(title="Mergington High School API",
-              description="API for viewing and signing up for extracurricular activities")
+              description="API for viewing and signing up for extracurricular activities",
+              default_response_class=ORJSONResponse,
+              lifespan=lifespan)
 
-# Mount the static files directory
+# Mount the static files directory.
+# In production, set SERVE_STATIC_IN_APP=0 and let a web server such as nginx
+# serve /static directly so asset requests never reach Python.
 current_dir = Path(__file__).parent
-app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
-          "static")), name="static")
+if os.getenv("SERVE_STATIC_IN_APP", "1") == "1":
+    app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
+              "static")), name="static")
+
+ACTIVITIES_FILE = Path(__file__).parent.parent / "activities.json"
+
 
 # Load activities from JSON file
 def load_activities():
     """Load activities from the activities.json file"""
-    activities_file = Path(__file__).parent.parent / "activities.json"
     try:
-        with open(activities_file, 'r') as f:
-            return json.load(f)
+        return orjson.loads(ACTIVITIES_FILE.read_bytes())
     except FileNotFoundError:
-        raise RuntimeError(f"activities.json file not found at {activities_file}")
-    except json.JSONDecodeError as e:
+        raise RuntimeError(f"activities.json file not found at {ACTIVITIES_FILE}")
+    except orjson.JSONDecodeError as e:
         raise RuntimeError(f"Invalid JSON in activities.json: {e}")
 
-# In-memory activity database (loaded from activities.json)
+# In-memory activity database (loaded from activities.json at startup)
 # Note: Changes to participants are stored in memory only and will be lost on restart.
 # To persist changes, you would need to implement a save mechanism.
-activities = load_activities()
+activities = {}
+
+# Set view of each activity's participants for O(1) membership checks.
+# The participants lists stay the source of truth for display order.
+participant_sets = {}
+
+# Reverse index of participants: {email: {activity_name, ...}}
+student_to_activities = defaultdict(set)
+
+# One lock per activity, held while signup/unregister check and change participants
+activity_locks = {}
+
+# Serialized /activities response and its ETag, built on the first GET after a change.
+# The ETag is a hash of the content, so it stays valid across server restarts.
+# Structure: (json_bytes, etag) or None when participants have changed
+activities_cache = None
+
+
+def invalidate_activities_cache():
+    """Drop the cached activities response after participants change"""
+    global activities_cache
+    activities_cache = None
+
+
+def get_activities_cache() -> tuple:
+    """Return the serialized activities response and its ETag, building them if needed"""
+    global activities_cache
+    if activities_cache is None:
+        content = orjson.dumps(activities)
+        activities_cache = (content, f'"{hashlib.md5(content).hexdigest()}"')
+    return activities_cache
+
+# Attendance statuses are stored as small integer codes and turned back
+# into strings only when building responses
+STATUSES = ("present", "absent", "excused")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+PRESENT, ABSENT, EXCUSED = range(len(STATUSES))
 
 # In-memory attendance database
-# Structure: {activity_name: {date: {email: status}}}
+# Structure: {activity_name: {date: {email: status_code}}}
 attendance_records = defaultdict(lambda: defaultdict(dict))
 
-# In-memory calendar events database
-# Structure: {event_id: event_data}
-calendar_events = {}
-event_id_counter = 1
+# Dates with attendance for each activity, kept sorted so listings come out in date order
+# (ISO YYYY-MM-DD strings sort chronologically)
+# Structure: {activity_name: [date, ...]}
+attendance_dates = defaultdict(list)
+
+# Response-ready [{"email", "status"}] lists per day, built on first read and
+# dropped by record_attendance whenever that day changes
+# Structure: {activity_name: {date: [{"email": email, "status": status}, ...]}}
+attendance_list_views = defaultdict(dict)
+
+# Per-student view of the same records, kept in sync by mark_attendance
+# Structure: {email: {activity_name: {date: status_code}}}
+student_index = defaultdict(lambda: defaultdict(dict))
+
+# Running attendance totals, kept in sync by mark_attendance
+# Structure: {activity_name: {email: [present, absent, excused]}} (indexed by status code)
+stats_index = defaultdict(lambda: defaultdict(lambda: [0] * len(STATUSES)))
+
+# Optional SQLite persistence for attendance. When ATTENDANCE_DB is set, every
+# mark is written through to the database and the in-memory structures above
+# are rebuilt from it at startup; otherwise attendance lives in memory only.
+ATTENDANCE_DB = os.getenv("ATTENDANCE_DB")
+attendance_db = None
+
+
+def open_attendance_db(path: str):
+    """Open the attendance database and load its records into memory"""
+    global attendance_db
+    attendance_db = sqlite3.connect(path)
+    attendance_db.executescript(
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "CREATE TABLE IF NOT EXISTS attendance ("
+        " activity TEXT NOT NULL, date TEXT NOT NULL, email TEXT NOT NULL, status TEXT NOT NULL,"
+        " PRIMARY KEY (activity, date, email))"
+    )
+    for activity_name, record_date, email, status in attendance_db.execute(
+            "SELECT activity, date, email, status FROM attendance"):
+        if activity_name in activities:
+            record_attendance(activity_name, record_date, email, STATUS_CODES[status])
+
+
+def record_attendance(activity_name: str, record_date: str, email: str, status_code: int):
+    """Store one attendance mark and keep the student and stats indexes in sync"""
+    activity_records = attendance_records[activity_name]
+    if record_date not in activity_records:
+        bisect.insort(attendance_dates[activity_name], record_date)
+    day_records = activity_records[record_date]
+    student_counts = stats_index[activity_name][email]
+    # Re-marking a student for the same day replaces their previous status
+    previous_code = day_records.get(email)
+    if previous_code is not None:
+        student_counts[previous_code] -= 1
+    student_counts[status_code] += 1
+    
+    day_records[email] = status_code
+    attendance_list_views[activity_name].pop(record_date, None)
+    student_index[email][activity_name][record_date] = status_code
+
+
+def attendance_list_view(activity_name: str, record_date: str) -> list:
+    """Return one day's attendance as a list of records, rebuilding it only after a write"""
+    day_views = attendance_list_views[activity_name]
+    records = day_views.get(record_date)
+    if records is None:
+        records = day_views[record_date] = [
+            {"email": email, "status": STATUSES[code]}
+            for email, code in attendance_records[activity_name][record_date].items()
+        ]
+    return records
+
 
 # Pydantic models for request/response
 class AttendanceRecord(BaseModel):
     email: str
     status: Literal["present", "absent", "excused"]
 
-class CalendarEvent(BaseModel):
-    id: Optional[int] = None
-    title: str
-    activity_name: str
-    description: Optional[str] = None
-    start: str  # ISO 8601 datetime string
-    end: str  # ISO 8601 datetime string
-    recurrence: Optional[str] = None  # e.g., "weekly", "daily"
-    recurrence_end: Optional[str] = None  # End date for recurring events
-    room: Optional[str] = None
-    color: Optional[str] = None
-    is_cancelled: bool = False
-    cancellation_dates: List[str] = []
-    
-    class Config:
-        # Use a function to create a new list for each instance
-        schema_extra = {
-            "example": {
-                "cancellation_dates": []
-            }
-        }
-    
-    def __init__(self, **data):
-        if 'cancellation_dates' not in data:
-            data['cancellation_dates'] = []
-        super().__init__(**data)  # Specific dates when event is cancelled
-
 class EventCreate(BaseModel):
     title: str
     activity_name: str
@@ -103,7 +220,7 @@ class EventUpdate(BaseModel):
     is_cancelled: Optional[bool] = None
 
 class AttendanceMarkRequest(BaseModel):
-    date: str  # Format: YYYY-MM-DD
+    date: date  # Format: YYYY-MM-DD
     records: List[AttendanceRecord]
 
 class AttendanceStats(BaseModel):
@@ -115,187 +232,193 @@ class AttendanceStats(BaseModel):
     attendance_percentage: float
 
 
+def get_activity(activity_name: str) -> dict:
+    """Look up an activity from the path, or 404 if it doesn't exist"""
+    activity = activities.get(activity_name)
+    if activity is None:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return activity
+
+
 @app.get("/")
-def root():
+async def root():
     return RedirectResponse(url="/static/index.html")
 
 
+@app.get("/healthz")
+async def healthz():
+    """Cheap liveness check for scripts and load balancers"""
+    return {"status": "ok"}
+
+
 @app.get("/activities")
-def get_activities():
-    return activities
+async def get_activities(request: Request):
+    content, etag = get_activities_cache()
+    headers = {"ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @app.post("/activities/{activity_name}/signup")
-def signup_for_activity(activity_name: str, email: str):
+async def signup_for_activity(activity_name: str, email: str, activity: dict = Depends(get_activity)):
     """Sign up a student for an activity"""
-    # Validate activity exists
-    if activity_name not in activities:
-        raise HTTPException(status_code=404, detail="Activity not found")
-
-    # Get the specific activity
-    activity = activities[activity_name]
-
-    # Validate student is not already signed up
-    if email in activity["participants"]:
-        raise HTTPException(
-            status_code=400,
-            detail="Student is already signed up"
-        )
+    async with activity_locks[activity_name]:
+        # Validate student is not already signed up
+        if email in participant_sets[activity_name]:
+            raise HTTPException(
+                status_code=400,
+                detail="Student is already signed up"
+            )
 
-    # Add student
-    activity["participants"].append(email)
+        # Add student
+        activity["participants"].append(email)
+        participant_sets[activity_name].add(email)
+        student_to_activities[email].add(activity_name)
+        invalidate_activities_cache()
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
 @app.delete("/activities/{activity_name}/unregister")
-def unregister_from_activity(activity_name: str, email: str):
+async def unregister_from_activity(activity_name: str, email: str, activity: dict = Depends(get_activity)):
     """Unregister a student from an activity"""
-    # Validate activity exists
-    if activity_name not in activities:
-        raise HTTPException(status_code=404, detail="Activity not found")
-
-    # Get the specific activity
-    activity = activities[activity_name]
-
-    # Validate student is signed up
-    if email not in activity["participants"]:
-        raise HTTPException(
-            status_code=400,
-            detail="Student is not signed up for this activity"
-        )
+    async with activity_locks[activity_name]:
+        # Validate student is signed up
+        if email not in participant_sets[activity_name]:
+            raise HTTPException(
+                status_code=400,
+                detail="Student is not signed up for this activity"
+            )
 
-    # Remove student
-    activity["participants"].remove(email)
+        # Remove student
+        activity["participants"].remove(email)
+        participant_sets[activity_name].discard(email)
+        student_to_activities[email].discard(activity_name)
+        invalidate_activities_cache()
     return {"message": f"Unregistered {email} from {activity_name}"}
 
 
-# Attendance endpoints
-@app.post("/activities/{activity_name}/attendance")
-def mark_attendance(activity_name: str, attendance_data: AttendanceMarkRequest):
-    """Mark attendance for an activity session"""
-    # Validate activity exists
-    if activity_name not in activities:
-        raise HTTPException(status_code=404, detail="Activity not found")
-    
-    # Validate date format
+def parse_date(date_str: str) -> date:
+    """Parse a YYYY-MM-DD date string"""
+    # Cheap shape check first; date() then rejects out-of-range months and days
+    if (len(date_str) != 10 or date_str[4] != "-" or date_str[7] != "-"
+            or not (date_str[:4] + date_str[5:7] + date_str[8:]).isdigit()):
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
     try:
-        attendance_date = datetime.strptime(attendance_data.date, "%Y-%m-%d").date()
+        return date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:]))
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+
+# Attendance endpoints
+@app.post("/activities/{activity_name}/attendance", dependencies=[Depends(get_activity)])
+async def mark_attendance(activity_name: str, attendance_data: AttendanceMarkRequest):
+    """Mark attendance for an activity session"""
+    # Pydantic has already parsed the date; keep the YYYY-MM-DD string as the storage key
+    attendance_date = attendance_data.date.isoformat()
     
     # Don't allow future dates
-    if attendance_date > date.today():
+    if attendance_data.date > date.today():
         raise HTTPException(status_code=400, detail="Cannot mark attendance for future dates")
     
-    activity = activities[activity_name]
+    participants = participant_sets[activity_name]
+    
+    # Validate all students are registered before changing anything,
+    # so a bad record doesn't leave the day partially marked
+    unregistered = [r.email for r in attendance_data.records if r.email not in participants]
+    if unregistered:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Student {unregistered[0]} is not registered for {activity_name}"
+        )
+    
+    # Write the whole batch in one transaction before updating memory
+    if attendance_db is not None:
+        with attendance_db:
+            attendance_db.executemany(
+                "INSERT OR REPLACE INTO attendance (activity, date, email, status) VALUES (?, ?, ?, ?)",
+                [(activity_name, attendance_date, r.email, r.status) for r in attendance_data.records]
+            )
     
     # Mark attendance for each student
     for record in attendance_data.records:
-        # Validate student is registered for this activity
-        if record.email not in activity["participants"]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Student {record.email} is not registered for {activity_name}"
-            )
-        
-        attendance_records[activity_name][attendance_data.date][record.email] = record.status
+        record_attendance(activity_name, attendance_date, record.email, STATUS_CODES[record.status])
     
     return {
-        "message": f"Attendance marked for {activity_name} on {attendance_data.date}",
+        "message": f"Attendance marked for {activity_name} on {attendance_date}",
         "records_updated": len(attendance_data.records)
     }
 
 
-@app.get("/activities/{activity_name}/attendance")
-def get_attendance(
+@app.get("/activities/{activity_name}/attendance", dependencies=[Depends(get_activity)])
+async def get_attendance(
     activity_name: str,
     date: Optional[str] = Query(None, description="Specific date (YYYY-MM-DD)")
 ):
     """Get attendance records for an activity"""
-    # Validate activity exists
-    if activity_name not in activities:
-        raise HTTPException(status_code=404, detail="Activity not found")
-    
+    # Read with .get() so lookups don't add empty entries to the defaultdicts
+    activity_records = attendance_records.get(activity_name, {})
     if date:
         # Return attendance for specific date
-        if date not in attendance_records[activity_name]:
-            return {"date": date, "records": []}
-        
-        records = [
-            {"email": email, "status": status}
-            for email, status in attendance_records[activity_name][date].items()
-        ]
+        records = attendance_list_view(activity_name, date) if date in activity_records else []
         return {"date": date, "records": records}
     else:
-        # Return all attendance records
-        all_records = {}
-        for record_date, students in attendance_records[activity_name].items():
-            all_records[record_date] = [
-                {"email": email, "status": status}
-                for email, status in students.items()
-            ]
+        # Return all attendance records, oldest date first
+        all_records = {
+            record_date: attendance_list_view(activity_name, record_date)
+            for record_date in attendance_dates.get(activity_name, ())
+        }
         return {"activity": activity_name, "attendance": all_records}
 
 
-@app.get("/activities/{activity_name}/attendance/stats")
-def get_attendance_stats(activity_name: str):
-    """Get attendance statistics for all participants in an activity"""
-    # Validate activity exists
-    if activity_name not in activities:
-        raise HTTPException(status_code=404, detail="Activity not found")
+def compute_attendance_stats(activity_name: str) -> List[AttendanceStats]:
+    """Build attendance statistics for every participant from the running totals"""
+    activity_stats = stats_index.get(activity_name, {})
+    no_records = [0] * len(STATUSES)
     
-    activity = activities[activity_name]
     stats = []
-    
-    for email in activity["participants"]:
-        present_count = 0
-        absent_count = 0
-        excused_count = 0
-        total_sessions = 0
-        
-        # Count attendance across all dates
-        for date_records in attendance_records[activity_name].values():
-            if email in date_records:
-                total_sessions += 1
-                status = date_records[email]
-                if status == "present":
-                    present_count += 1
-                elif status == "absent":
-                    absent_count += 1
-                elif status == "excused":
-                    excused_count += 1
+    for email in activities[activity_name]["participants"]:
+        counts = activity_stats.get(email, no_records)
+        total_sessions = sum(counts)
         
         # Calculate percentage (present + excused out of total)
         attendance_percentage = 0.0
         if total_sessions > 0:
-            attendance_percentage = ((present_count + excused_count) / total_sessions) * 100
+            attendance_percentage = ((counts[PRESENT] + counts[EXCUSED]) / total_sessions) * 100
         
         stats.append(AttendanceStats(
             email=email,
             total_sessions=total_sessions,
-            present=present_count,
-            absent=absent_count,
-            excused=excused_count,
+            present=counts[PRESENT],
+            absent=counts[ABSENT],
+            excused=counts[EXCUSED],
             attendance_percentage=round(attendance_percentage, 2)
         ))
     
-    return {"activity": activity_name, "statistics": stats}
+    return stats
+
+
+@app.get("/activities/stats/all")
+async def get_all_attendance_stats():
+    """Get attendance statistics for every activity in one request"""
+    return {name: compute_attendance_stats(name) for name in activities}
+
+
+@app.get("/activities/{activity_name}/attendance/stats", dependencies=[Depends(get_activity)])
+async def get_attendance_stats(activity_name: str):
+    """Get attendance statistics for all participants in an activity"""
+    return {"activity": activity_name, "statistics": compute_attendance_stats(activity_name)}
 
 
 @app.get("/students/{email}/attendance")
-def get_student_attendance(email: str):
+async def get_student_attendance(email: str):
     """Get attendance records for a specific student across all activities"""
-    student_attendance = {}
-    
-    for activity_name, activity in activities.items():
-        if email in activity["participants"]:
-            activity_records = {}
-            for record_date, students in attendance_records[activity_name].items():
-                if email in students:
-                    activity_records[record_date] = students[email]
-            
-            if activity_records:
-                student_attendance[activity_name] = activity_records
+    # Only report activities the student is still signed up for, with dates in order
+    student_attendance = {
+        activity_name: {record_date: STATUSES[code] for record_date, code in sorted(records.items())}
+        for activity_name, records in student_index.get(email, {}).items()
+        if activity_name in student_to_activities.get(email, ())
+    }
     
     if not student_attendance:
         return {
@@ -308,32 +431,187 @@ def get_student_attendance(email: str):
 
 
 # Calendar endpoints
+@lru_cache(maxsize=4096)
+def _parse_iso_datetime(dt_str: str) -> datetime:
+    """Parse ISO 8601 datetime string (cached; invalid strings raise and aren't cached)"""
+    return datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+
+
 def parse_datetime(dt_str: str) -> datetime:
     """Parse ISO 8601 datetime string"""
     try:
-        return datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+        return _parse_iso_datetime(dt_str)
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid datetime format: {dt_str}")
 
 
-def check_event_conflicts(start: datetime, end: datetime, room: Optional[str] = None, exclude_event_id: Optional[int] = None) -> List[dict]:
-    """Check for scheduling conflicts"""
-    conflicts = []
-    
-    for event_id, event in calendar_events.items():
-        if exclude_event_id and event_id == exclude_event_id:
-            continue
-        
-        if event.get("is_cancelled"):
-            continue
-            
-        event_start = parse_datetime(event["start"])
-        event_end = parse_datetime(event["end"])
-        
-        # Check time overlap
-        if (start < event_end and end > event_start):
-            # If room is specified, only flag if same room
-            if room and event.get("room") == room:
+class EventInstance:
+    """One occurrence of a stored event: its own start/end over the shared event dict"""
+    __slots__ = ("_base", "start", "end")
+
+    def __init__(self, base: dict, start: str, end: str):
+        self._base, self.start, self.end = base, start, end
+
+    def __getitem__(self, key: str):
+        if key == "start":
+            return self.start
+        if key == "end":
+            return self.end
+        return self._base[key]
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> dict:
+        """Copy the occurrence into a plain dict for JSON responses"""
+        instance = self._base.copy()
+        instance["start"] = self.start
+        instance["end"] = self.end
+        return instance
+
+
+class EventStore:
+    """In-memory calendar events together with the indexes used to query them"""
+
+    def __init__(self):
+        # Structure: {event_id: event_data}
+        self.events = {}
+        # Parsed datetimes for each event, so conflict checks and recurrence
+        # expansion don't re-parse the ISO strings on every request
+        # Structure: {event_id: (start_dt, end_dt, recurrence_end_dt)}
+        self.times = {}
+        # Set view of each event's cancellation_dates list for O(1) membership checks
+        # Structure: {event_id: {date_str, ...}}
+        self.cancellations = {}
+        # Events grouped by room and sorted by start time, used to find overlaps
+        # without scanning every event. Events without a room are stored under None.
+        # Structure: {room: [(start_dt, end_dt, event_id), ...]}
+        self.by_room = defaultdict(list)
+        # Longest event duration seen per room, bounding how far back an overlap search goes
+        self.max_duration = defaultdict(timedelta)
+        self.next_id = 1
+        self._lock = threading.Lock()
+
+    def get(self, event_id: int) -> dict:
+        """Return a stored event, or 404 if it doesn't exist"""
+        event = self.events.get(event_id)
+        if event is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return event
+
+    def add(self, event: dict, start_dt: datetime, end_dt: datetime,
+            recurrence_end_dt: Optional[datetime] = None) -> int:
+        """Store a new event under the next id and return that id
+
+        recurrence_end_dt is the parsed recurrence_end; without one,
+        recurrences run for a year from the start.
+        """
+        # Build everything first so nothing below can fail with the event half-stored
+        times = self._event_times(start_dt, end_dt, recurrence_end_dt)
+        cancelled = set(event.get("cancellation_dates", []))
+        with self._lock:
+            event_id = self.next_id
+            self.next_id += 1
+            event["id"] = event_id
+            self.events[event_id] = event
+            self.times[event_id] = times
+            self.cancellations[event_id] = cancelled
+            self._index(event_id)
+        return event_id
+
+    def update(self, event_id: int, changes: dict, start_dt: Optional[datetime] = None,
+               end_dt: Optional[datetime] = None) -> dict:
+        """Apply field changes to an event, passing start_dt/end_dt when its times change"""
+        with self._lock:
+            event = self.events[event_id]
+            # Re-index the event in case its room or times change
+            self._unindex(event_id)
+            event.update(changes)
+            if start_dt is not None:
+                # Updates can't change recurrence_end, so keep its already-parsed value
+                recurrence_end_dt = self.times[event_id][2] if event.get("recurrence_end") else None
+                self.times[event_id] = self._event_times(start_dt, end_dt, recurrence_end_dt)
+            self._index(event_id)
+        return event
+
+    def remove(self, event_id: int):
+        """Delete an event and its index entries"""
+        with self._lock:
+            self._unindex(event_id)
+            del self.events[event_id]
+            del self.times[event_id]
+            del self.cancellations[event_id]
+
+    def cancel_date(self, event_id: int, date_str: str):
+        """Cancel one occurrence of a recurring event"""
+        with self._lock:
+            cancelled = self.cancellations[event_id]
+            if date_str not in cancelled:
+                cancelled.add(date_str)
+                self.events[event_id]["cancellation_dates"].append(date_str)
+
+    @staticmethod
+    def _event_times(start_dt: datetime, end_dt: datetime, recurrence_end_dt: Optional[datetime]) -> tuple:
+        if recurrence_end_dt is None:
+            recurrence_end_dt = start_dt + timedelta(days=365)
+        return start_dt, end_dt, recurrence_end_dt
+
+    def _index(self, event_id: int):
+        start_dt, end_dt, _ = self.times[event_id]
+        room = self.events[event_id].get("room")
+        bisect.insort(self.by_room[room], (start_dt, end_dt, event_id))
+        self.max_duration[room] = max(self.max_duration[room], end_dt - start_dt)
+
+    def _unindex(self, event_id: int):
+        start_dt, end_dt, _ = self.times[event_id]
+        bucket = self.by_room[self.events[event_id].get("room")]
+        del bucket[bisect.bisect_left(bucket, (start_dt, end_dt, event_id))]
+
+    def _overlapping_ids(self, room: Optional[str], start: datetime, end: datetime) -> List[int]:
+        """Ids of events in a room's bucket whose time range overlaps start..end"""
+        bucket = self.by_room.get(room)
+        if not bucket:
+            return []
+
+        # Everything before this index starts before `end`; walk back from it until
+        # events start too early to still be running at `start`
+        earliest_start = start - self.max_duration[room]
+        overlapping = []
+        for i in range(bisect.bisect_left(bucket, (end,)) - 1, -1, -1):
+            event_start, event_end, event_id = bucket[i]
+            if event_start <= earliest_start:
+                break
+            if event_end > start:
+                overlapping.append(event_id)
+        return overlapping
+
+    def find_conflicts(self, start: datetime, end: datetime, room: Optional[str] = None,
+                       exclude_event_id: Optional[int] = None) -> List[dict]:
+        """Check for scheduling conflicts"""
+        # If room is specified, only events in the same room conflict;
+        # otherwise any overlapping event does
+        if room:
+            candidate_ids = self._overlapping_ids(room, start, end)
+        else:
+            candidate_ids = [
+                event_id
+                for bucket_room in list(self.by_room)
+                for event_id in self._overlapping_ids(bucket_room, start, end)
+            ]
+
+        conflicts = []
+        for event_id in sorted(candidate_ids):
+            if exclude_event_id and event_id == exclude_event_id:
+                continue
+
+            event = self.events[event_id]
+            if event.get("is_cancelled"):
+                continue
+
+            if room:
                 conflicts.append({
                     "event_id": event_id,
                     "title": event["title"],
@@ -342,88 +620,118 @@ def check_event_conflicts(start: datetime, end: datetime, room: Optional[str] =
                     "end": event["end"]
                 })
             # Always flag activity conflicts
-            elif not room:
+            else:
                 conflicts.append({
                     "event_id": event_id,
                     "title": event["title"],
                     "start": event["start"],
                     "end": event["end"]
                 })
-    
-    return conflicts
-
 
-def generate_recurring_events(event: dict) -> List[dict]:
-    """Generate instances of a recurring event"""
-    if not event.get("recurrence"):
-        return [event]
-    
-    events = []
-    start_dt = parse_datetime(event["start"])
-    end_dt = parse_datetime(event["end"])
-    duration = end_dt - start_dt
-    
-    recurrence_end_dt = parse_datetime(event["recurrence_end"]) if event.get("recurrence_end") else start_dt + timedelta(days=365)
-    
-    current_dt = start_dt
-    cancellation_dates = set(event.get("cancellation_dates", []))
-    
-    while current_dt <= recurrence_end_dt:
-        # Check if this specific date is cancelled
-        event_date_str = current_dt.date().isoformat()
-        if event_date_str not in cancellation_dates:
-            instance = event.copy()
-            instance["start"] = current_dt.isoformat()
-            instance["end"] = (current_dt + duration).isoformat()
-            events.append(instance)
+        return conflicts
+
+    def occurrences(self, event: dict, window_start: Optional[datetime] = None,
+                    window_end: Optional[datetime] = None) -> Iterator[tuple]:
+        """Yield (EventInstance, start_dt, end_dt) for each occurrence of an event
+
+        When a window is given, only occurrences overlapping it are produced
+        (ending at or after window_start and starting at or before window_end).
+        """
+        times = self.times.get(event["id"])
+        if times is None:
+            # Deleted while a streamed export was iterating over a snapshot
+            return
+        start_dt, end_dt, recurrence_end_dt = times
+        if not event.get("recurrence"):
+            if (window_start is None or end_dt >= window_start) and (window_end is None or start_dt <= window_end):
+                yield EventInstance(event, event["start"], event["end"]), start_dt, end_dt
+            return
+
+        duration = end_dt - start_dt
+        if window_end is not None and window_end < recurrence_end_dt:
+            recurrence_end_dt = window_end
+
+        current_dt = start_dt
+        step = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}.get(event["recurrence"])
+        if step is not None and window_start is not None:
+            # Jump straight to the last occurrence ending before the window
+            skipped = (window_start - duration - start_dt) // step
+            if skipped > 0:
+                current_dt += skipped * step
+
+        cancellation_dates = self.cancellations[event["id"]]
+
+        while current_dt <= recurrence_end_dt:
+            # Check if this specific date is cancelled
+            event_date_str = current_dt.date().isoformat()
+            instance_end = current_dt + duration
+            if event_date_str not in cancellation_dates and (window_start is None or instance_end >= window_start):
+                yield EventInstance(event, current_dt.isoformat(), instance_end.isoformat()), current_dt, instance_end
         
-        # Move to next occurrence
-        if event["recurrence"] == "daily":
-            current_dt += timedelta(days=1)
-        elif event["recurrence"] == "weekly":
-            current_dt += timedelta(weeks=1)
-        elif event["recurrence"] == "monthly":
-            # Simple monthly recurrence - handle day overflow
-            try:
-                if current_dt.month == 12:
-                    next_month = current_dt.replace(year=current_dt.year + 1, month=1)
-                else:
-                    next_month = current_dt.replace(month=current_dt.month + 1)
-                current_dt = next_month
-            except ValueError:
-                # Day doesn't exist in next month (e.g., Jan 31 -> Feb 31)
-                # Move to last day of next month
-                if current_dt.month == 12:
-                    next_month = 1
-                    next_year = current_dt.year + 1
-                else:
-                    next_month = current_dt.month + 1
-                    next_year = current_dt.year
+            # Move to next occurrence
+            if step is not None:
+                current_dt += step
+            elif event["recurrence"] == "monthly":
+                # Simple monthly recurrence - handle day overflow
+                try:
+                    if current_dt.month == 12:
+                        next_month = current_dt.replace(year=current_dt.year + 1, month=1)
+                    else:
+                        next_month = current_dt.replace(month=current_dt.month + 1)
+                    current_dt = next_month
+                except ValueError:
+                    # Day doesn't exist in next month (e.g., Jan 31 -> Feb 31)
+                    # Move to last day of next month
+                    if current_dt.month == 12:
+                        next_month = 1
+                        next_year = current_dt.year + 1
+                    else:
+                        next_month = current_dt.month + 1
+                        next_year = current_dt.year
                 
-                # Find last day of next month
-                if next_month == 12:
-                    last_day = 31
-                elif next_month in [4, 6, 9, 11]:
-                    last_day = 30
-                elif next_month == 2:
-                    # Check for leap year
-                    is_leap = (next_year % 4 == 0 and next_year % 100 != 0) or (next_year % 400 == 0)
-                    last_day = 29 if is_leap else 28
-                else:
-                    last_day = 31
+                    # Find last day of next month
+                    if next_month == 12:
+                        last_day = 31
+                    elif next_month in [4, 6, 9, 11]:
+                        last_day = 30
+                    elif next_month == 2:
+                        # Check for leap year
+                        is_leap = (next_year % 4 == 0 and next_year % 100 != 0) or (next_year % 400 == 0)
+                        last_day = 29 if is_leap else 28
+                    else:
+                        last_day = 31
                 
-                current_dt = current_dt.replace(year=next_year, month=next_month, day=last_day)
-        else:
-            break
-    
-    return events
+                    current_dt = current_dt.replace(year=next_year, month=next_month, day=last_day)
+            else:
+                break
+
+    def iter_instances(self, window_start: Optional[datetime] = None, window_end: Optional[datetime] = None,
+                       activity: Optional[str] = None, activities_set: Optional[set] = None) -> Iterator[tuple]:
+        """Yield (EventInstance, start_dt, end_dt) for stored events matching the filters"""
+        # Iterate over a snapshot so events can be added or removed mid-iteration
+        for event in list(self.events.values()):
+            # Skip whole events before expanding their recurrences
+            if activity and event["activity_name"] != activity:
+                continue
+            if activities_set is not None and event["activity_name"] not in activities_set:
+                continue
+            yield from self.occurrences(event, window_start, window_end)
 
 
-@app.post("/calendar/events")
-def create_event(event_data: EventCreate):
-    """Create a new calendar event"""
-    global event_id_counter
-    
+# In-memory calendar events database
+calendar_store = EventStore()
+
+
+def iter_calendar_instances(window_start: Optional[datetime] = None, window_end: Optional[datetime] = None,
+                            activity: Optional[str] = None, email: Optional[str] = None) -> Iterator[tuple]:
+    """Yield (EventInstance, start_dt, end_dt) for stored events matching the filters"""
+    # Filter to events for activities the student is enrolled in
+    student_activities = student_to_activities.get(email, set()) if email else None
+    return calendar_store.iter_instances(window_start, window_end, activity, student_activities)
+
+
+def _create_event(event_data: EventCreate) -> dict:
+    """Validate and store a new calendar event"""
     # Validate activity exists
     if event_data.activity_name not in activities:
         raise HTTPException(status_code=404, detail="Activity not found")
@@ -435,26 +743,28 @@ def create_event(event_data: EventCreate):
     if end_dt <= start_dt:
         raise HTTPException(status_code=400, detail="End time must be after start time")
     
-    # Check for conflicts
-    conflicts = check_event_conflicts(start_dt, end_dt, event_data.room)
-    
-    event = CalendarEvent(
-        id=event_id_counter,
-        title=event_data.title,
-        activity_name=event_data.activity_name,
-        description=event_data.description,
-        start=event_data.start,
-        end=event_data.end,
-        recurrence=event_data.recurrence,
-        recurrence_end=event_data.recurrence_end,
-        room=event_data.room,
-        color=event_data.color or get_activity_color(event_data.activity_name),
-        is_cancelled=False,
-        cancellation_dates=[]
-    )
+    recurrence_end_dt = parse_datetime(event_data.recurrence_end) if event_data.recurrence_end else None
     
-    calendar_events[event_id_counter] = event.dict()
-    event_id_counter += 1
+    # Check for conflicts
+    conflicts = calendar_store.find_conflicts(start_dt, end_dt, event_data.room)
+    
+    # Stored events are plain dicts built from the already-validated EventCreate fields,
+    # plus the server-managed id (filled in by the store), color and cancellation state
+    event = {
+        "id": None,
+        "title": event_data.title,
+        "activity_name": event_data.activity_name,
+        "description": event_data.description,
+        "start": event_data.start,
+        "end": event_data.end,
+        "recurrence": event_data.recurrence,
+        "recurrence_end": event_data.recurrence_end,
+        "room": event_data.room,
+        "color": event_data.color or get_activity_color(event_data.activity_name),
+        "is_cancelled": False,
+        "cancellation_dates": []
+    }
+    calendar_store.add(event, start_dt, end_dt, recurrence_end_dt)
     
     return {
         "event": event,
@@ -463,86 +773,89 @@ def create_event(event_data: EventCreate):
     }
 
 
+@app.post("/calendar/events")
+async def create_event(event_data: EventCreate):
+    """Create a new calendar event"""
+    return _create_event(event_data)
+
+
+@app.post("/calendar/events/bulk")
+async def create_events_bulk(events_data: List[EventCreate]):
+    """Create several calendar events in a single request"""
+    results = []
+    created = 0
+
+    # Events are created in order, so later events see conflicts with earlier ones
+    for index, event_data in enumerate(events_data):
+        try:
+            result = _create_event(event_data)
+        except HTTPException as e:
+            results.append({
+                "index": index,
+                "id": None,
+                "outcome": "error",
+                "detail": e.detail
+            })
+            continue
+
+        created += 1
+        results.append({
+            "index": index,
+            "id": result["event"]["id"],
+            "outcome": "conflict" if result["has_conflicts"] else "success",
+            "conflicts": result["conflicts"]
+        })
+
+    return {"results": results, "created": created}
+
+
 @app.get("/calendar/events")
-def get_events(
+async def get_events(
     start: Optional[str] = Query(None, description="Start date filter (ISO 8601)"),
     end: Optional[str] = Query(None, description="End date filter (ISO 8601)"),
     activity: Optional[str] = Query(None, description="Filter by activity name"),
     email: Optional[str] = Query(None, description="Filter by student email")
 ):
     """Get calendar events with optional filters"""
-    all_events = []
-    
-    # Generate recurring event instances
-    for event_id, event in calendar_events.items():
-        event_instances = generate_recurring_events(event)
-        all_events.extend(event_instances)
-    
-    # Apply filters
-    filtered_events = all_events
-    
-    if start:
-        start_dt = parse_datetime(start)
-        filtered_events = [e for e in filtered_events if parse_datetime(e["end"]) >= start_dt]
-    
-    if end:
-        end_dt = parse_datetime(end)
-        filtered_events = [e for e in filtered_events if parse_datetime(e["start"]) <= end_dt]
+    start_dt = parse_datetime(start) if start else None
+    end_dt = parse_datetime(end) if end else None
     
-    if activity:
-        filtered_events = [e for e in filtered_events if e["activity_name"] == activity]
-    
-    if email:
-        # Filter to events for activities the student is enrolled in
-        student_activities = [name for name, details in activities.items() if email in details["participants"]]
-        filtered_events = [e for e in filtered_events if e["activity_name"] in student_activities]
-    
-    return {"events": filtered_events, "count": len(filtered_events)}
+    events = [
+        instance.to_dict() for instance, _, _ in iter_calendar_instances(start_dt, end_dt, activity, email)
+    ]
+    return {"events": events, "count": len(events)}
 
 
 @app.get("/calendar/events/{event_id}")
-def get_event(event_id: int):
+async def get_event(event_id: int):
     """Get a specific calendar event"""
-    if event_id not in calendar_events:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    return calendar_events[event_id]
+    return calendar_store.get(event_id)
 
 
 @app.put("/calendar/events/{event_id}")
-def update_event(event_id: int, event_update: EventUpdate):
+async def update_event(event_id: int, event_update: EventUpdate):
     """Update a calendar event"""
-    if event_id not in calendar_events:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    event = calendar_events[event_id]
-    
-    # Update fields
-    if event_update.title is not None:
-        event["title"] = event_update.title
-    if event_update.description is not None:
-        event["description"] = event_update.description
-    if event_update.start is not None:
-        event["start"] = event_update.start
-    if event_update.end is not None:
-        event["end"] = event_update.end
-    if event_update.room is not None:
-        event["room"] = event_update.room
-    if event_update.color is not None:
-        event["color"] = event_update.color
-    if event_update.is_cancelled is not None:
-        event["is_cancelled"] = event_update.is_cancelled
+    event = calendar_store.get(event_id)
     
-    # Validate dates if updated
+    # Validate dates before changing anything if they are being updated
     if event_update.start or event_update.end:
-        start_dt = parse_datetime(event["start"])
-        end_dt = parse_datetime(event["end"])
+        start_dt = parse_datetime(event_update.start or event["start"])
+        end_dt = parse_datetime(event_update.end or event["end"])
         
         if end_dt <= start_dt:
             raise HTTPException(status_code=400, detail="End time must be after start time")
-        
+    
+    # Update fields; fields left out of the request (or sent as null) are kept as they are
+    changes = event_update.model_dump(exclude_unset=True, exclude_none=True)
+    
+    if event_update.start or event_update.end:
+        calendar_store.update(event_id, changes, start_dt, end_dt)
+    else:
+        calendar_store.update(event_id, changes)
+    
+    if event_update.start or event_update.end:
         # Check for conflicts
-        conflicts = check_event_conflicts(start_dt, end_dt, event.get("room"), exclude_event_id=event_id)
+        conflicts = calendar_store.find_conflicts(start_dt, end_dt, event.get("room"), exclude_event_id=event_id)
         return {
             "event": event,
             "conflicts": conflicts,
@@ -553,110 +866,81 @@ def update_event(event_id: int, event_update: EventUpdate):
 
 
 @app.delete("/calendar/events/{event_id}")
-def delete_event(event_id: int):
+async def delete_event(event_id: int):
     """Delete a calendar event"""
-    if event_id not in calendar_events:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    del calendar_events[event_id]
+    calendar_store.get(event_id)
+    calendar_store.remove(event_id)
     return {"message": f"Event {event_id} deleted successfully"}
 
 
 @app.post("/calendar/events/{event_id}/cancel-date")
-def cancel_event_date(event_id: int, date_str: str = Query(..., description="Date to cancel (YYYY-MM-DD)")):
+async def cancel_event_date(event_id: int, date_str: str = Query(..., description="Date to cancel (YYYY-MM-DD)")):
     """Cancel a specific date for a recurring event"""
-    if event_id not in calendar_events:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    event = calendar_events[event_id]
+    event = calendar_store.get(event_id)
     
     if not event.get("recurrence"):
         raise HTTPException(status_code=400, detail="Event is not recurring")
     
     # Validate date format
-    try:
-        datetime.strptime(date_str, "%Y-%m-%d")
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-    
-    if "cancellation_dates" not in event:
-        event["cancellation_dates"] = []
+    parse_date(date_str)
     
-    if date_str not in event["cancellation_dates"]:
-        event["cancellation_dates"].append(date_str)
+    calendar_store.cancel_date(event_id, date_str)
     
     return {"message": f"Event cancelled for {date_str}", "event": event}
 
 
+def format_ical_datetime(dt: datetime) -> str:
+    """Format a datetime for iCal (YYYYMMDDTHHMMSSZ) without going through strftime"""
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}T{dt.hour:02d}{dt.minute:02d}{dt.second:02d}Z"
+
+
 @app.get("/calendar/export")
-def export_calendar(
+async def export_calendar(
     activity: Optional[str] = Query(None, description="Filter by activity name"),
     email: Optional[str] = Query(None, description="Filter by student email")
 ):
     """Export calendar events as iCal/ICS format"""
-    # Get all events with recurring instances
-    all_events = []
-    for event_id, event in calendar_events.items():
-        event_instances = generate_recurring_events(event)
-        all_events.extend(event_instances)
-    
-    # Apply filters
-    filtered_events = all_events
-    
-    if activity:
-        filtered_events = [e for e in filtered_events if e["activity_name"] == activity]
-    
-    if email:
-        # Filter to events for activities the student is enrolled in
-        student_activities = [name for name, details in activities.items() if email in details["participants"]]
-        filtered_events = [e for e in filtered_events if e["activity_name"] in student_activities]
-    
-    events = filtered_events
-    
-    # Generate iCal format
-    ical_lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//Mergington High School//EN",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
-        "X-WR-CALNAME:Mergington High School Activities",
-        "X-WR-TIMEZONE:UTC"
-    ]
-    
-    for event in events:
-        start_dt = parse_datetime(event["start"])
-        end_dt = parse_datetime(event["end"])
+    events = iter_calendar_instances(activity=activity, email=email)
+    
+    async def ical_stream():
+        # Stream one VEVENT at a time instead of building the whole file in memory
+        yield (
+            "BEGIN:VCALENDAR\r\n"
+            "VERSION:2.0\r\n"
+            "PRODID:-//Mergington High School//EN\r\n"
+            "CALSCALE:GREGORIAN\r\n"
+            "METHOD:PUBLISH\r\n"
+            "X-WR-CALNAME:Mergington High School Activities\r\n"
+            "X-WR-TIMEZONE:UTC"
+        ).encode()
         
-        # Format dates for iCal (YYYYMMDDTHHMMSSZ)
-        start_ical = start_dt.strftime("%Y%m%dT%H%M%SZ")
-        end_ical = end_dt.strftime("%Y%m%dT%H%M%SZ")
-        
-        # Create unique UID for recurring instances
-        uid = f"{event['id']}"
-        if event.get("recurrence"):
-            # Add date to UID for recurring event instances
-            uid += f"-{start_dt.strftime('%Y%m%d')}"
-        uid += "@mergington.edu"
+        for event, start_dt, end_dt in events:
+            start_ical = format_ical_datetime(start_dt)
+            end_ical = format_ical_datetime(end_dt)
+            
+            # Create unique UID for recurring instances
+            uid = f"{event['id']}"
+            if event.get("recurrence"):
+                # Add date to UID for recurring event instances
+                uid += f"-{start_ical[:8]}"
+            uid += "@mergington.edu"
+            
+            yield (
+                "\r\nBEGIN:VEVENT"
+                f"\r\nUID:{uid}"
+                f"\r\nDTSTART:{start_ical}"
+                f"\r\nDTEND:{end_ical}"
+                f"\r\nSUMMARY:{event['title']}"
+                f"\r\nDESCRIPTION:{event.get('description', '')}"
+                f"\r\nLOCATION:{event.get('room', '')}"
+                "\r\nSTATUS:CONFIRMED"
+                "\r\nEND:VEVENT"
+            ).encode()
         
-        ical_lines.extend([
-            "BEGIN:VEVENT",
-            f"UID:{uid}",
-            f"DTSTART:{start_ical}",
-            f"DTEND:{end_ical}",
-            f"SUMMARY:{event['title']}",
-            f"DESCRIPTION:{event.get('description', '')}",
-            f"LOCATION:{event.get('room', '')}",
-            "STATUS:CONFIRMED",
-            "END:VEVENT"
-        ])
-    
-    ical_lines.append("END:VCALENDAR")
-    
-    ical_content = "\r\n".join(ical_lines)
+        yield b"\r\nEND:VCALENDAR"
     
-    return Response(
-        content=ical_content,
+    return StreamingResponse(
+        ical_stream(),
         media_type="text/calendar",
         headers={
             "Content-Disposition": "attachment; filename=mergington-calendar.ics"
@@ -664,6 +948,7 @@ def export_calendar(
     )
 
 
+@lru_cache(maxsize=None)
 def get_activity_color(activity_name: str) -> str:
     """Get a consistent color for an activity"""
     colors = [
@@ -676,6 +961,7 @@ def get_activity_color(activity_name: str) -> str:
         "#20c997",  # Teal
         "#e83e8c"   # Pink
     ]
-    # Use hash of activity name to get consistent color
-    index = hash(activity_name) % len(colors)
+    # Use a CRC of the activity name so the color survives restarts
+    # (the built-in hash() of a str is randomized per process)
+    index = zlib.crc32(activity_name.encode()) % len(colors)
     return colors[index]
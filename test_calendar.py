@@ -1,149 +1,218 @@
 """
-Test script to verify calendar and scheduling functionality
+Tests for the calendar and scheduling endpoints
+
+Run against a live server with pytest (add -n auto to spread them over workers):
+
+    uvicorn src.app:app
+    pytest test_calendar.py -n auto
 """
+import pytest
 import requests
-import json
-from datetime import datetime, timedelta
+import sys
 
-BASE_URL = "http://localhost:8000"
+from test_common import BASE_URL, DEFAULT_TIMEOUT, SESSION, read_json
 
-def test_calendar_system():
-    print("🎯 Testing Calendar and Scheduling System\n")
-    
-    # 1. Create a calendar event
-    print("1️⃣ Creating a calendar event for Chess Club")
-    event_data = {
-        "title": "Chess Club Meeting",
-        "activity_name": "Chess Club",
-        "description": "Weekly chess practice and tournament preparation",
-        "start": "2024-12-06T15:30:00",
-        "end": "2024-12-06T17:00:00",
-        "room": "Room 101"
-    }
-    
-    response = requests.post(f"{BASE_URL}/calendar/events", json=event_data)
-    print(f"   Status: {response.status_code}")
-    result = response.json()
-    print(f"   Response: {json.dumps(result, indent=2)}\n")
-    event_id = result["event"]["id"]
-    
-    # 2. Create a recurring event
-    print("2️⃣ Creating a recurring event for Programming Class")
-    recurring_event_data = {
-        "title": "Programming Class",
-        "activity_name": "Programming Class",
-        "description": "Learn programming fundamentals",
-        "start": "2024-12-03T15:30:00",
-        "end": "2024-12-03T16:30:00",
-        "recurrence": "weekly",
-        "recurrence_end": "2024-12-31T16:30:00",
-        "room": "Computer Lab"
-    }
-    
-    response = requests.post(f"{BASE_URL}/calendar/events", json=recurring_event_data)
-    print(f"   Status: {response.status_code}")
-    result = response.json()
-    print(f"   Response: {json.dumps(result, indent=2)}\n")
-    recurring_event_id = result["event"]["id"]
-    
-    # 3. Get all events
-    print("3️⃣ Getting all calendar events")
-    response = requests.get(f"{BASE_URL}/calendar/events")
-    print(f"   Status: {response.status_code}")
-    result = response.json()
-    print(f"   Found {result['count']} events\n")
-    
-    # 4. Get events filtered by activity
-    print("4️⃣ Getting events for Programming Class")
-    response = requests.get(
-        f"{BASE_URL}/calendar/events",
-        params={"activity": "Programming Class"}
-    )
-    print(f"   Status: {response.status_code}")
-    result = response.json()
-    print(f"   Found {result['count']} events")
-    print(f"   First event: {json.dumps(result['events'][0], indent=2) if result['events'] else 'None'}\n")
-    
-    # 5. Get specific event
-    print(f"5️⃣ Getting event {event_id}")
-    response = requests.get(f"{BASE_URL}/calendar/events/{event_id}")
-    print(f"   Status: {response.status_code}")
-    print(f"   Response: {json.dumps(response.json(), indent=2)}\n")
-    
-    # 6. Update event
-    print(f"6️⃣ Updating event {event_id}")
+# Endpoint URLs used by the tests
+EVENTS_URL = f"{BASE_URL}/calendar/events"
+BULK_EVENTS_URL = f"{EVENTS_URL}/bulk"
+EXPORT_URL = f"{BASE_URL}/calendar/export"
+
+# Event payloads
+EVENT_DATA = {
+    "title": "Chess Club Meeting",
+    "activity_name": "Chess Club",
+    "description": "Weekly chess practice and tournament preparation",
+    "start": "2024-12-06T15:30:00",
+    "end": "2024-12-06T17:00:00",
+    "room": "Room 101"
+}
+
+RECURRING_EVENT_DATA = {
+    "title": "Programming Class",
+    "activity_name": "Programming Class",
+    "description": "Learn programming fundamentals",
+    "start": "2024-12-03T15:30:00",
+    "end": "2024-12-03T16:30:00",
+    "recurrence": "weekly",
+    "recurrence_end": "2024-12-31T16:30:00",
+    "room": "Computer Lab"
+}
+
+CONFLICT_EVENT_DATA = {
+    "title": "Math Club",
+    "activity_name": "Math Club",
+    "description": "Math practice",
+    "start": "2024-12-06T16:00:00",  # Overlaps with Chess Club
+    "end": "2024-12-06T17:30:00",
+    "room": "Room 101"
+}
+
+# Requests with fixed payloads are prepared once and re-sent by every test that needs them,
+# so their JSON bodies and headers aren't rebuilt each time
+CREATE_EVENT_REQUEST = SESSION.prepare_request(requests.Request("POST", EVENTS_URL, json=EVENT_DATA))
+CREATE_RECURRING_EVENT_REQUEST = SESSION.prepare_request(
+    requests.Request("POST", EVENTS_URL, json=RECURRING_EVENT_DATA)
+)
+CREATE_EVENTS_REQUEST = SESSION.prepare_request(
+    requests.Request("POST", BULK_EVENTS_URL, json=[EVENT_DATA, RECURRING_EVENT_DATA])
+)
+CREATE_CONFLICT_REQUEST = SESSION.prepare_request(
+    requests.Request("POST", EVENTS_URL, json=CONFLICT_EVENT_DATA)
+)
+
+def instance_starts(events, event_id):
+    """Start times of the listed instances that belong to one event"""
+    return [event["start"] for event in events if event["id"] == event_id]
+
+
+@pytest.fixture
+def created_event(session):
+    """A one-off Chess Club event, deleted again after the test"""
+    response = session.send(CREATE_EVENT_REQUEST, timeout=DEFAULT_TIMEOUT)
+    assert response.status_code == 200
+    event = read_json(response)["event"]
+    yield event
+    session.delete(f"{EVENTS_URL}/{event['id']}", timeout=DEFAULT_TIMEOUT)
+
+@pytest.fixture
+def recurring_event(session):
+    """A weekly Programming Class event through December 2024, deleted again after the test"""
+    response = session.send(CREATE_RECURRING_EVENT_REQUEST, timeout=DEFAULT_TIMEOUT)
+    assert response.status_code == 200
+    event = read_json(response)["event"]
+    yield event
+    session.delete(f"{EVENTS_URL}/{event['id']}", timeout=DEFAULT_TIMEOUT)
+
+
+def test_create_events_in_bulk(session):
+    response = session.send(CREATE_EVENTS_REQUEST, timeout=DEFAULT_TIMEOUT)
+    assert response.status_code == 200
+    result = read_json(response)
+    try:
+        assert result["created"] == 2
+        assert all(r["outcome"] in ("success", "conflict") for r in result["results"])
+        assert all(isinstance(r["id"], int) for r in result["results"])
+    finally:
+        for r in result["results"]:
+            if r["id"] is not None:
+                session.delete(f"{EVENTS_URL}/{r['id']}", timeout=DEFAULT_TIMEOUT)
+
+def test_bulk_create_reports_invalid_items(session):
+    invalid_event_data = dict(RECURRING_EVENT_DATA, title="Invalid bulk item", recurrence_end="not-a-date")
+    response = session.post(BULK_EVENTS_URL, json=[invalid_event_data, EVENT_DATA], timeout=DEFAULT_TIMEOUT)
+    assert response.status_code == 200
+    result = read_json(response)
+    invalid, valid = result["results"]
+    try:
+        assert invalid["outcome"] == "error"
+        assert invalid["id"] is None
+        assert result["created"] == 1
+        
+        # The invalid item must not leave anything behind. Items are created in order within
+        # one request, so a half-stored invalid item would sit at the id just before the valid one.
+        response = session.get(f"{EVENTS_URL}/{valid['id'] - 1}", timeout=DEFAULT_TIMEOUT)
+        assert response.status_code == 404 or read_json(response)["title"] != invalid_event_data["title"]
+        
+        # The valid item is fully usable
+        event_url = f"{EVENTS_URL}/{valid['id']}"
+        response = session.get(event_url, timeout=DEFAULT_TIMEOUT)
+        assert response.status_code == 200
+        assert read_json(response)["title"] == EVENT_DATA["title"]
+    finally:
+        if valid["id"] is not None:
+            response = session.delete(f"{EVENTS_URL}/{valid['id']}", timeout=DEFAULT_TIMEOUT)
+            assert response.status_code == 200
+
+def test_get_all_events(session, created_event):
+    response = session.get(EVENTS_URL, timeout=DEFAULT_TIMEOUT)
+    assert response.status_code == 200
+    result = read_json(response)
+    assert result["count"] == len(result["events"])
+    assert instance_starts(result["events"], created_event["id"]) == [EVENT_DATA["start"]]
+
+def test_filter_events_by_activity(session, recurring_event):
+    response = session.get(EVENTS_URL, params={"activity": "Programming Class"}, timeout=DEFAULT_TIMEOUT)
+    assert response.status_code == 200
+    events = read_json(response)["events"]
+    assert all(event["activity_name"] == "Programming Class" for event in events)
+    # Weekly from Tuesday 2024-12-03 up to the recurrence end on 2024-12-31
+    assert instance_starts(events, recurring_event["id"]) == [
+        "2024-12-03T15:30:00",
+        "2024-12-10T15:30:00",
+        "2024-12-17T15:30:00",
+        "2024-12-24T15:30:00",
+        "2024-12-31T15:30:00"
+    ]
+
+def test_get_event(session, created_event):
+    response = session.get(f"{EVENTS_URL}/{created_event['id']}", timeout=DEFAULT_TIMEOUT)
+    assert response.status_code == 200
+    assert read_json(response) == created_event
+
+def test_update_event(session, created_event):
     update_data = {
         "room": "Room 202",
         "description": "Updated description"
     }
-    response = requests.put(f"{BASE_URL}/calendar/events/{event_id}", json=update_data)
-    print(f"   Status: {response.status_code}")
-    print(f"   Response: {json.dumps(response.json(), indent=2)}\n")
-    
-    # 7. Cancel a specific date for recurring event
-    print(f"7️⃣ Cancelling recurring event on 2024-12-10")
-    response = requests.post(
-        f"{BASE_URL}/calendar/events/{recurring_event_id}/cancel-date",
-        params={"date_str": "2024-12-10"}
+    response = session.put(f"{EVENTS_URL}/{created_event['id']}", json=update_data, timeout=DEFAULT_TIMEOUT)
+    assert response.status_code == 200
+    event = read_json(response)["event"]
+    assert event["room"] == "Room 202"
+    assert event["description"] == "Updated description"
+    assert event["title"] == created_event["title"]
+
+def test_cancel_recurring_date(session, recurring_event):
+    event_id = recurring_event["id"]
+    response = session.post(
+        f"{EVENTS_URL}/{event_id}/cancel-date",
+        params={"date_str": "2024-12-10"},
+        timeout=DEFAULT_TIMEOUT
     )
-    print(f"   Status: {response.status_code}")
-    print(f"   Response: {json.dumps(response.json(), indent=2)}\n")
+    assert response.status_code == 200
+    assert read_json(response)["event"]["cancellation_dates"] == ["2024-12-10"]
     
-    # 8. Test conflict detection
-    print("8️⃣ Testing conflict detection (creating overlapping event)")
-    conflict_event_data = {
-        "title": "Math Club",
-        "activity_name": "Math Club",
-        "description": "Math practice",
-        "start": "2024-12-06T16:00:00",  # Overlaps with Chess Club
-        "end": "2024-12-06T17:30:00",
-        "room": "Room 101"
-    }
-    response = requests.post(f"{BASE_URL}/calendar/events", json=conflict_event_data)
-    print(f"   Status: {response.status_code}")
-    result = response.json()
-    print(f"   Has conflicts: {result.get('has_conflicts', False)}")
-    if result.get('conflicts'):
-        print(f"   Conflicts: {json.dumps(result['conflicts'], indent=2)}\n")
-    
-    # 9. Export calendar as iCal
-    print("9️⃣ Exporting calendar as iCal")
-    response = requests.get(f"{BASE_URL}/calendar/export")
-    print(f"   Status: {response.status_code}")
-    print(f"   Content-Type: {response.headers.get('content-type')}")
-    print(f"   Calendar preview (first 500 chars):")
-    print(f"   {response.text[:500]}\n")
-    
-    # 10. Get events with date range filter
-    print("🔟 Getting events for December 2024")
-    response = requests.get(
-        f"{BASE_URL}/calendar/events",
-        params={
-            "start": "2024-12-01T00:00:00",
-            "end": "2024-12-31T23:59:59"
-        }
+    response = session.get(EVENTS_URL, params={"activity": "Programming Class"}, timeout=DEFAULT_TIMEOUT)
+    assert "2024-12-10T15:30:00" not in instance_starts(read_json(response)["events"], event_id)
+
+def test_conflict_detection(session, created_event):
+    response = session.send(CREATE_CONFLICT_REQUEST, timeout=DEFAULT_TIMEOUT)
+    assert response.status_code == 200
+    result = read_json(response)
+    session.delete(f"{EVENTS_URL}/{result['event']['id']}", timeout=DEFAULT_TIMEOUT)
+    assert result["has_conflicts"]
+    assert created_event["id"] in [conflict["event_id"] for conflict in result["conflicts"]]
+
+def test_export_calendar(session, created_event):
+    # Stream the export so only the checked bytes are read
+    with session.get(EXPORT_URL, stream=True, timeout=DEFAULT_TIMEOUT) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/calendar")
+        preview = response.raw.read(500).decode("utf-8", "replace")
+    assert preview.startswith("BEGIN:VCALENDAR\r\n")
+
+def test_events_in_date_range(session, created_event, recurring_event):
+    response = session.get(
+        EVENTS_URL,
+        params={"start": "2024-12-01T00:00:00", "end": "2024-12-31T23:59:59"},
+        timeout=DEFAULT_TIMEOUT
     )
-    print(f"   Status: {response.status_code}")
-    result = response.json()
-    print(f"   Found {result['count']} events in December\n")
-    
-    # 11. Delete event
-    print(f"1️⃣1️⃣ Deleting event {event_id}")
-    response = requests.delete(f"{BASE_URL}/calendar/events/{event_id}")
-    print(f"   Status: {response.status_code}")
-    print(f"   Response: {json.dumps(response.json(), indent=2)}\n")
+    assert response.status_code == 200
+    events = read_json(response)["events"]
+    assert len(instance_starts(events, created_event["id"])) == 1
+    assert len(instance_starts(events, recurring_event["id"])) == 5
+
+def test_delete_event(session):
+    response = session.send(CREATE_EVENT_REQUEST, timeout=DEFAULT_TIMEOUT)
+    event_url = f"{EVENTS_URL}/{read_json(response)['event']['id']}"
     
-    print("✅ All calendar tests completed!")
+    response = session.delete(event_url, timeout=DEFAULT_TIMEOUT)
+    assert response.status_code == 200
+    assert session.get(event_url, timeout=DEFAULT_TIMEOUT).status_code == 404
+
 
 if __name__ == "__main__":
     print("Make sure the FastAPI server is running: uvicorn src.app:app --reload")
     print("Then run this test script.\n")
     
-    try:
-        test_calendar_system()
-    except requests.exceptions.ConnectionError:
-        print("❌ Error: Cannot connect to server. Make sure it's running!")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+    with SESSION:
+        sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,39 @@
+"""
+Shared setup for the test scripts
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+
+BASE_URL = "http://localhost:8000"
+
+# (connect, read) timeout in seconds for every request, so a stuck server can't hang a test
+DEFAULT_TIMEOUT = (1, 5)
+
+# Retry connection failures and gateway errors with exponential backoff (0.2s, 0.4s, ...).
+# POST is left out of allowed_methods so a create that reached the server isn't sent
+# twice; failed connects are still retried for every method.
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.2,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=["GET", "PUT", "DELETE"]
+)
+
+# One session for all test scripts, so every request reuses pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY))
+
+def read_json(response):
+    """Parse a JSON response body with orjson instead of the stdlib json behind response.json()"""
+    return orjson.loads(response.content)
+
+def server_is_up() -> bool:
+    """Quick /healthz check, so a missing server fails fast instead of partway through a test"""
+    # Use a one-off request so the session's retries don't delay the failure
+    try:
+        requests.get(f"{BASE_URL}/healthz", timeout=(0.2, 0.5)).raise_for_status()
+    except requests.RequestException:
+        return False
+    return True
@@ -1,90 +1,59 @@
 """
-Test script to verify Manga Maniacs activity is properly configured
+Test that the Manga Maniacs activity is properly configured
+
+Run against a live server with pytest:
+
+    uvicorn src.app:app
+    pytest test_manga_maniacs.py
 """
-import requests
-import json
+import orjson
+import pytest
 import sys
+import tempfile
+from pathlib import Path
+
+from test_common import BASE_URL, DEFAULT_TIMEOUT, SESSION, read_json
+
+# The last /activities body and its ETag ("<etag>\n<body>"), kept between runs
+ACTIVITIES_CACHE = Path(tempfile.gettempdir()) / "mergington_activities_cache"
 
-BASE_URL = "http://localhost:8000"
+EXPECTED_MANGA_MANIACS = {
+    "description": "Dive into the epic worlds of Japanese Manga! Discover legendary heroes, intense battles, heartwarming friendships, and mind-bending plot twists. From shonen adventures to slice-of-life stories, unleash your inner otaku!",
+    "schedule": "Tuesdays, 7:00 PM - 8:00 PM",
+    "max_participants": 15,
+    "participants": []  # Empty initially
+}
 
-def test_manga_maniacs_exists():
+def fetch_activities(session):
+    """GET /activities, reusing the previous run's body when the server answers 304 Not Modified"""
+    headers = {}
+    cached_body = None
+    if ACTIVITIES_CACHE.exists():
+        cached_etag, _, cached_body = ACTIVITIES_CACHE.read_bytes().partition(b"\n")
+        headers["If-None-Match"] = cached_etag.decode()
+    
+    response = session.get(f"{BASE_URL}/activities", headers=headers, timeout=DEFAULT_TIMEOUT)
+    if response.status_code == 304:
+        return orjson.loads(cached_body)
+    assert response.status_code == 200
+    
+    etag = response.headers.get("ETag")
+    if etag:
+        ACTIVITIES_CACHE.write_bytes(etag.encode() + b"\n" + response.content)
+    return read_json(response)
+
+def test_manga_maniacs_exists(session):
     """Test that Manga Maniacs activity exists in the system"""
-    print("🎯 Testing Manga Maniacs Activity\n")
-    
-    # Get all activities
-    print("1️⃣ Fetching all activities...")
-    response = requests.get(f"{BASE_URL}/activities")
-    
-    if response.status_code != 200:
-        print(f"❌ Failed to fetch activities: {response.status_code}")
-        return False
-    
-    activities = response.json()
+    activities = fetch_activities(session)
+    assert "Manga Maniacs" in activities
     
-    # Check if Manga Maniacs exists
-    if "Manga Maniacs" not in activities:
-        print("❌ Manga Maniacs activity not found!")
-        return False
-    
-    print("✅ Manga Maniacs activity found!\n")
-    
-    # Verify the activity details
+    # Compare every expected field at once; pytest shows the differing fields on failure
     manga_maniacs = activities["Manga Maniacs"]
-    
-    print("2️⃣ Verifying activity details...")
-    
-    # Check description
-    expected_description = "Dive into the epic worlds of Japanese Manga! Discover legendary heroes, intense battles, heartwarming friendships, and mind-bending plot twists. From shonen adventures to slice-of-life stories, unleash your inner otaku!"
-    if manga_maniacs["description"] != expected_description:
-        print(f"❌ Description mismatch!")
-        print(f"   Expected: {expected_description}")
-        print(f"   Got: {manga_maniacs['description']}")
-        return False
-    print(f"✅ Description: {manga_maniacs['description']}")
-    
-    # Check schedule
-    expected_schedule = "Tuesdays, 7:00 PM - 8:00 PM"
-    if manga_maniacs["schedule"] != expected_schedule:
-        print(f"❌ Schedule mismatch!")
-        print(f"   Expected: {expected_schedule}")
-        print(f"   Got: {manga_maniacs['schedule']}")
-        return False
-    print(f"✅ Schedule: {manga_maniacs['schedule']}")
-    
-    # Check max_participants
-    expected_max = 15
-    if manga_maniacs["max_participants"] != expected_max:
-        print(f"❌ Max participants mismatch!")
-        print(f"   Expected: {expected_max}")
-        print(f"   Got: {manga_maniacs['max_participants']}")
-        return False
-    print(f"✅ Max participants: {manga_maniacs['max_participants']}")
-    
-    # Check participants list exists and is empty
-    if "participants" not in manga_maniacs:
-        print("❌ Participants field missing!")
-        return False
-    if not isinstance(manga_maniacs["participants"], list):
-        print("❌ Participants should be a list!")
-        return False
-    if len(manga_maniacs["participants"]) != 0:
-        print(f"❌ Participants should be empty initially!")
-        return False
-    print(f"✅ Participants: {manga_maniacs['participants']} (empty, as expected)")
-    
-    print("\n🎉 All tests passed!")
-    return True
+    assert {field: manga_maniacs.get(field) for field in EXPECTED_MANGA_MANIACS} == EXPECTED_MANGA_MANIACS
 
 if __name__ == "__main__":
     print("Make sure the FastAPI server is running: uvicorn src.app:app --reload")
     print("Then run this test script.\n")
     
-    try:
-        success = test_manga_maniacs_exists()
-        sys.exit(0 if success else 1)
-    except requests.exceptions.ConnectionError:
-        print("❌ Error: Cannot connect to server. Make sure it's running!")
-        sys.exit(1)
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        sys.exit(1)
+    with SESSION:
+        sys.exit(pytest.main([__file__, "-v"]))